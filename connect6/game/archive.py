@@ -0,0 +1,241 @@
+import hashlib
+import logging
+import sqlite3
+import uuid
+from os import PathLike
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from connect6.game.geometry import Geometry
+from connect6.game.player import BasePlayer
+from connect6.game.replay import ReplayCursor
+from connect6.game.state import GameState
+
+__all__ = [
+    "GameArchive",
+    "position_hash",
+]
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    num_players INTEGER NOT NULL,
+    num_cells_per_turn INTEGER NOT NULL,
+    num_cells_to_win INTEGER NOT NULL,
+    winner INTEGER,
+    num_turns INTEGER NOT NULL,
+    win_turn INTEGER
+);
+CREATE INDEX IF NOT EXISTS games_outcome ON games (winner, num_turns);
+CREATE INDEX IF NOT EXISTS games_win_turn ON games (winner, win_turn);
+CREATE INDEX IF NOT EXISTS games_num_turns ON games (num_turns);
+CREATE TABLE IF NOT EXISTS positions (
+    hash INTEGER NOT NULL,
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    turn INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS positions_hash ON positions (hash);
+"""
+
+
+def position_hash(board: np.ndarray) -> int:
+    """Returns a signed 64-bit hash of the board, suitable for SQLite."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(np.int32(board.shape[0]).tobytes())
+    digest.update(np.ascontiguousarray(board, np.int32).tobytes())
+    return int.from_bytes(digest.digest(), "little", signed=True)
+
+
+class GameArchive:
+    """Directory of dumped games with an SQLite index over them.
+
+    Games are indexed once, when added, by their configuration, outcome and
+    every position they reached. Queries read the index only and load the
+    matching games lazily.
+    """
+
+    INDEX_NAME = "index.sqlite"
+    GAMES_DIR = "games"
+
+    def __init__(self, root: PathLike) -> None:
+        self._root = Path(root)
+        (self._root / self.GAMES_DIR).mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self._root / self.INDEX_NAME)
+        self._connection.executescript(_SCHEMA)
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def __len__(self) -> int:
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM games").fetchone()
+        return count
+
+    def __enter__(self) -> "GameArchive":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def add(self, state: GameState) -> int:
+        """Dumps the game into the archive and indexes it."""
+        path = self._root / self.GAMES_DIR / f"{uuid.uuid4().hex}.npz"
+        state.dump(path)
+        with self._connection:
+            return self._index(path, state)
+
+    def add_files(self, paths: Iterable[PathLike]) -> List[int]:
+        """Indexes already dumped games, skipping the ones indexed before."""
+        with self._connection:
+            return [self._index(Path(path)) for path in paths]
+
+    def scan(self, directory: Optional[PathLike] = None) -> List[int]:
+        """Indexes all new dumps in the directory (archive's own by default)."""
+        directory = self._root / self.GAMES_DIR if directory is None else directory
+        return self.add_files(sorted(Path(directory).glob("*.npz")))
+
+    def load(self, game_id: int) -> GameState:
+        row = self._connection.execute(
+            "SELECT path FROM games WHERE id = ?", (game_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(game_id)
+        return GameState.load(self._resolve(row[0]))
+
+    def replay(
+        self, game_id: int, checkpoint_interval: Optional[int] = None
+    ) -> ReplayCursor:
+        return ReplayCursor(self.load(game_id), checkpoint_interval)
+
+    def find_ids(
+        self,
+        *,
+        winner: Optional[BasePlayer] = None,
+        min_num_turns: Optional[int] = None,
+        max_num_turns: Optional[int] = None,
+        min_win_turn: Optional[int] = None,
+        max_win_turn: Optional[int] = None,
+        position: Optional[np.ndarray] = None,
+        size: Optional[int] = None,
+        num_players: Optional[int] = None,
+        num_cells_per_turn: Optional[int] = None,
+        num_cells_to_win: Optional[int] = None,
+    ) -> List[int]:
+        """Returns ids of games matching all of the given conditions.
+
+        ``*_num_turns`` bound the whole game length, while ``*_win_turn`` bound
+        the turn the game was won at: a game may go on after it, and games
+        without a winner never match ``*_win_turn``. ``position`` is a board as
+        returned by ``GameState.generate_board``.
+        """
+        query = "SELECT DISTINCT games.id FROM games"
+        conditions: List[str] = []
+        params: List[Any] = []
+        if position is not None:
+            query += " JOIN positions ON positions.game_id = games.id"
+            conditions.append("positions.hash = ?")
+            params.append(position_hash(position))
+            size = position.shape[0] if size is None else size
+        columns = [
+            ("winner = ?", None if winner is None else int(winner.value)),
+            ("num_turns >= ?", min_num_turns),
+            ("num_turns <= ?", max_num_turns),
+            ("win_turn >= ?", min_win_turn),
+            ("win_turn <= ?", max_win_turn),
+            ("size = ?", size),
+            ("num_players = ?", num_players),
+            ("num_cells_per_turn = ?", num_cells_per_turn),
+            ("num_cells_to_win = ?", num_cells_to_win),
+        ]
+        for condition, value in columns:
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY games.id"
+        return [game_id for (game_id,) in self._connection.execute(query, params)]
+
+    def find(self, **conditions: Any) -> Iterator[GameState]:
+        """Lazily loads games matching the conditions, see ``find_ids``."""
+        for game_id in self.find_ids(**conditions):
+            yield self.load(game_id)
+
+    def _resolve(self, path: str) -> Path:
+        return self._root / path
+
+    def _relative(self, path: Path) -> str:
+        path = path.resolve()
+        try:
+            return str(path.relative_to(self._root.resolve()))
+        except ValueError:
+            return str(path)
+
+    def _index(self, path: Path, state: Optional[GameState] = None) -> int:
+        relative_path = self._relative(path)
+        row = self._connection.execute(
+            "SELECT id FROM games WHERE path = ?", (relative_path,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+
+        state = GameState.load(path) if state is None else state
+        winner, win_turn, hashes = self._replay(state)
+        cursor = self._connection.execute(
+            "INSERT INTO games (path, size, num_players, num_cells_per_turn, "
+            "num_cells_to_win, winner, num_turns, win_turn) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                relative_path,
+                state.size,
+                state.num_players,
+                state.num_cells_per_turn,
+                state.num_cells_to_win,
+                winner,
+                state.num_turns,
+                win_turn,
+            ),
+        )
+        game_id = cursor.lastrowid
+        self._connection.executemany(
+            "INSERT INTO positions (hash, game_id, turn) VALUES (?, ?, ?)",
+            [(hash_, game_id, turn) for turn, hash_ in enumerate(hashes, start=1)],
+        )
+        logger.debug(f"Indexed game #{game_id} from {relative_path}")
+        return game_id  # type: ignore
+
+    def _replay(
+        self, state: GameState
+    ) -> Tuple[Optional[int], Optional[int], List[int]]:
+        """Returns winner, winning turn and hashes of all reached positions."""
+        empty_state = GameState(
+            state.size,
+            state.num_players,
+            state.num_cells_per_turn,
+            state.num_cells_to_win,
+        )
+        board = empty_state.generate_board()
+        flat_board = board.ravel()
+        geometry = Geometry[state.size, state.num_cells_to_win]
+
+        winner, win_turn = None, None
+        hashes = [position_hash(board)]
+        for num_turns, data in enumerate(state.turns(), start=1):
+            indices = [geometry.flat_index(cell) for cell in data.cells]
+            flat_board[indices] = data.player.value
+            hashes.append(position_hash(board))
+            if winner is None and any(
+                geometry.is_win(flat_board, index, data.player.value)
+                for index in indices
+            ):
+                winner, win_turn = int(data.player.value), num_turns
+        return winner, win_turn, hashes
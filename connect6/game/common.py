@@ -1,13 +1,26 @@
 import dataclasses
-from typing import List, Tuple, Union
+from typing import Any, List, Tuple, Union
 
-from connect6.game import errors
+from connect6.game import constants, errors
 
 Number = Union[int, float]
 
 
-@dataclasses.dataclass(unsafe_hash=True)
-class Cell:
+class _InternedCellMeta(type):
+    def __call__(cls, row: int, col: int) -> Any:
+        # Cells within the largest board are preallocated and shared
+        try:
+            if cls is Cell and 0 <= row < _MAX_SIZE and 0 <= col < _MAX_SIZE:
+                return _CELLS[row][col]
+        except TypeError:
+            pass
+        return super().__call__(row, col)
+
+
+@dataclasses.dataclass(frozen=True)
+class Cell(metaclass=_InternedCellMeta):
+    __slots__ = ("row", "col")
+
     row: int
     col: int
 
@@ -15,10 +28,20 @@ class Cell:
         if self.row < 0 or self.col < 0:
             raise errors.NegativeCellCoordinateError(self.as_tuple())
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return self.__class__, (self.row, self.col)
+
     def as_tuple(self) -> Tuple[int, int]:
         return (self.row, self.col)
 
 
+_MAX_SIZE = constants.MAX_BOARD_SIZE
+_CELLS = [
+    [type.__call__(Cell, row, col) for col in range(_MAX_SIZE)]
+    for row in range(_MAX_SIZE)
+]
+
+
 def max_segment_length(array: List[Number], value: Number) -> int:
     max_length = 0
     length = 0
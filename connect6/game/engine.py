@@ -1,9 +1,9 @@
 import logging
-from typing import Optional
-
-import numpy as np
+from typing import Any, Iterable, Optional, Tuple
 
 from connect6.game import common, constants, errors
+from connect6.game.geometry import Geometry
+from connect6.game.move_log import Move, MoveLog
 from connect6.game.player import BasePlayer
 from connect6.game.state import GameState
 from connect6.game.turn_data import BaseTurnData, TurnData
@@ -31,6 +31,8 @@ class GameEngine:
                 size, num_players, num_cells_per_turn, num_cells_to_win
             )
         self._board = self.state.generate_board()
+        self._geometry = Geometry[self._size, self.state.num_cells_to_win]
+        self._log = MoveLog(self.state.turns())
         logger.info(f"Successfully initialized {self}")
 
     @classmethod
@@ -50,11 +52,30 @@ class GameEngine:
     def state(self) -> GameState:
         return self._state
 
+    @property
+    def log(self) -> MoveLog:
+        return self._log
+
     def turn(self, data: BaseTurnData) -> None:
+        """Validates and applies the turn.
+
+        Errors are raised only before the turn is applied: failures of move
+        log subscribers are logged and don't affect the game.
+        """
         self._validate_turn(data)
         self.state.turn(data)
         for cell in data.cells:
             self._board[cell.row, cell.col] = data.player.value
+        self._log.append(data)
+
+    def fast_forward(self, moves: Iterable[Move]) -> None:
+        """Applies moves from another engine's log, skipping already made ones."""
+        for move in moves:
+            if move.seq <= self._log.last_seq:
+                continue
+            if move.seq != self._log.last_seq + 1:
+                raise errors.MissingMovesError(self._log.last_seq + 1, move.seq)
+            self.turn(move.data)
 
     def is_win(self, data: BaseTurnData) -> bool:
         return any(self._check_win_condition(cell, data.player) for cell in data.cells)
@@ -62,6 +83,10 @@ class GameEngine:
     def is_occupied(self, cell: common.Cell) -> bool:
         return bool(self._board[cell.row, cell.col])
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # The board is not pickled, it's regenerated from the state
+        return self.__class__.restore, (self.state,)
+
     def __repr__(self) -> str:
         params = self.state.as_dict()
         params.pop("history")
@@ -74,19 +99,8 @@ class GameEngine:
 
     def _check_win_condition(self, cell: common.Cell, player: BasePlayer) -> bool:
         """Checks if at least N cells are connected using the given cell."""
-        radius = self.state.num_cells_to_win - 1
-        coords = np.array(cell.as_tuple(), np.int64)
-        directions = np.array([(1, -1), (1, 0), (1, 1), (0, 1)], np.int64)
-        for direction in directions:
-            values = []
-            for offset in range(-radius, radius + 1):
-                row, col = coords + offset * direction
-                if (0 <= row < self._size) and (0 <= col < self._size):
-                    values.append(self._board[row, col])
-            num_connected_cells = common.max_segment_length(values, player.value)
-            if num_connected_cells >= self.state.num_cells_to_win:
-                return True
-        return False
+        index = self._geometry.flat_index(cell)
+        return self._geometry.is_win(self._board.ravel(), index, player.value)
 
     def _validate_board_size(self, size: int) -> None:
         if size % 2 == 0:
@@ -35,3 +35,8 @@ class WrongBufferShapeError(RuntimeError):
 
 class WrongTurnBuffers(RuntimeError):
     pass
+
+
+class MissingMovesError(RuntimeError):
+    def __init__(self, expected_seq: int, seq: int) -> None:
+        super().__init__(f"Expected move #{expected_seq}, got #{seq}")
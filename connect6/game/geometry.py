@@ -0,0 +1,157 @@
+from typing import OrderedDict, Tuple
+
+import numpy as np
+
+from connect6.game import common
+
+__all__ = [
+    "BoardGeometry",
+    "Geometry",
+]
+
+# Four line directions, each one covers both of its rays.
+DIRECTIONS = np.array([(1, -1), (1, 0), (1, 1), (0, 1)], np.intp)
+NEIGHBOR_OFFSETS = np.array(
+    [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)], np.intp
+)
+
+
+class BoardGeometry:
+    """Precomputed read-only index tables for the given board configuration.
+
+    All indices are flat, i.e. ``row * size + col``, so they can be applied to
+    ``board.ravel()``. Padded entries point to the cell 0 and are masked out.
+    """
+
+    def __init__(self, size: int, num_cells_to_win: int) -> None:
+        if size < 1:
+            raise RuntimeError(f"Board size should be positive, got {size}")
+        if num_cells_to_win < 1:
+            raise RuntimeError(
+                f"Number of cells to win should be ≥ 1, got {num_cells_to_win}"
+            )
+        self._size = size
+        self._num_cells_to_win = num_cells_to_win
+
+        radius = num_cells_to_win - 1
+        rows, cols = np.divmod(np.arange(size * size, dtype=np.intp), size)
+
+        # (num_cells, num_directions, 2 * line_radius + 1), cells further than
+        # the board size are always out of bounds, so lines are clamped
+        line_radius = min(radius, size - 1)
+        offsets = np.arange(-line_radius, line_radius + 1, dtype=np.intp)
+        self.lines, self.line_masks = self._make_indices(
+            rows[:, None, None] + DIRECTIONS[None, :, 0, None] * offsets,
+            cols[:, None, None] + DIRECTIONS[None, :, 1, None] * offsets,
+        )
+
+        # (num_cells, num_directions * num_cells_to_win, num_cells_to_win),
+        # no windows at all if they don't fit the board
+        if num_cells_to_win <= size:
+            windows = np.stack(
+                [self.lines[..., s : s + num_cells_to_win] for s in range(radius + 1)],
+                axis=2,
+            )
+            window_masks = np.stack(
+                [
+                    self.line_masks[..., s : s + num_cells_to_win].all(axis=-1)
+                    for s in range(radius + 1)
+                ],
+                axis=2,
+            )
+        else:
+            windows = np.empty((size * size, 0, num_cells_to_win), np.intp)
+            window_masks = np.empty((size * size, 0), bool)
+        self.windows = windows.reshape((size * size, -1, num_cells_to_win))
+        self.window_masks = window_masks.reshape((size * size, -1))
+
+        # (num_windows, num_cells_to_win), each window once: the ones starting
+        # at the cell, i.e. with offsets 0, ..., radius along every direction
+        starting_windows = self.windows[:, radius::num_cells_to_win]
+        starting_masks = self.window_masks[:, radius::num_cells_to_win]
+        self.unique_windows = starting_windows[starting_masks]
+
+        # (num_cells, 8)
+        self.neighbors, self.neighbor_masks = self._make_indices(
+            rows[:, None] + NEIGHBOR_OFFSETS[:, 0],
+            cols[:, None] + NEIGHBOR_OFFSETS[:, 1],
+        )
+
+        for table in self._tables():
+            table.setflags(write=False)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def num_cells_to_win(self) -> int:
+        return self._num_cells_to_win
+
+    @property
+    def nbytes(self) -> int:
+        return sum(table.nbytes for table in self._tables())
+
+    def flat_index(self, cell: common.Cell) -> int:
+        return cell.row * self.size + cell.col
+
+    def is_win(self, flat_board: np.ndarray, index: int, value: int) -> bool:
+        """Checks if any window passing through the cell is filled with value."""
+        filled = (flat_board[self.windows[index]] == value).all(axis=-1)
+        return bool((filled & self.window_masks[index]).any())
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}"
+            f"(size={self.size}, num_cells_to_win={self.num_cells_to_win})"
+        )
+
+    def _make_indices(
+        self, rows: np.ndarray, cols: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        masks = (rows >= 0) & (rows < self.size) & (cols >= 0) & (cols < self.size)
+        indices = np.where(masks, rows * self.size + cols, 0)
+        return indices, masks
+
+    def _tables(self) -> Tuple[np.ndarray, ...]:
+        return (
+            self.lines,
+            self.line_masks,
+            self.windows,
+            self.window_masks,
+            self.unique_windows,
+            self.neighbors,
+            self.neighbor_masks,
+        )
+
+
+class _Registry(OrderedDict[Tuple[int, int], BoardGeometry]):
+    """LRU cache of geometries keyed by ``(size, num_cells_to_win)``.
+
+    Geometries are shared read-only between all engines of the same
+    configuration; processes started with ``fork`` inherit the cache. A single
+    geometry larger than ``MAX_BYTES`` is built every time and never cached.
+    """
+
+    MAX_BYTES = 64 * 2**20
+
+    def __getitem__(self, key: Tuple[int, int]) -> BoardGeometry:
+        if key in self:
+            self.move_to_end(key)
+            return super().__getitem__(key)
+        geometry = BoardGeometry(*key)
+        if geometry.nbytes <= self.MAX_BYTES:
+            self[key] = geometry
+            self._evict()
+        return geometry
+
+    @property
+    def nbytes(self) -> int:
+        return sum(geometry.nbytes for geometry in self.values())
+
+    def _evict(self) -> None:
+        while self.nbytes > self.MAX_BYTES:
+            self.popitem(last=False)
+
+
+Geometry = _Registry()
@@ -0,0 +1,65 @@
+import dataclasses
+import logging
+from typing import Callable, Iterable, List
+
+from connect6.game.turn_data import BaseTurnData
+
+__all__ = [
+    "Move",
+    "MoveLog",
+]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class Move:
+    """Turn data with its sequence number, i.e. the turn number it was made at."""
+
+    seq: int
+    data: BaseTurnData
+
+
+Subscriber = Callable[[Move], None]
+
+
+class MoveLog:
+    """Ordered log of moves, sequence numbers are consecutive and start from 1."""
+
+    def __init__(self, turns: Iterable[BaseTurnData] = ()) -> None:
+        self._moves: List[Move] = []
+        self._subscribers: List[Subscriber] = []
+        for data in turns:
+            self.append(data)
+
+    def __len__(self) -> int:
+        return len(self._moves)
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the last move, 0 if the log is empty."""
+        return len(self._moves)
+
+    def append(self, data: BaseTurnData) -> Move:
+        """Appends the move and notifies subscribers, never raises on their errors."""
+        move = Move(self.last_seq + 1, data)
+        self._moves.append(move)
+        for subscriber in self._subscribers:
+            try:
+                subscriber(move)
+            except Exception:
+                logger.exception(
+                    f"Subscriber {subscriber!r} failed on move #{move.seq}"
+                )
+        return move
+
+    def since(self, seq: int) -> List[Move]:
+        """Returns moves made after the move with given sequence number."""
+        return self._moves[max(seq, 0) :]
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        """Calls subscriber on every new move, its exceptions are logged."""
+        self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.remove(subscriber)
@@ -1,5 +1,5 @@
 import enum
-from typing import Dict
+from typing import Any, Dict, Tuple
 
 __all__ = [
     "BasePlayer",
@@ -18,6 +18,10 @@ class BasePlayer(enum.IntEnum):
     def first(cls) -> "BasePlayer":
         return cls.current(0)
 
+    def __reduce_ex__(self, protocol: object) -> Tuple[Any, ...]:
+        # Player classes are created dynamically, so they're restored via registry
+        return _restore_player, (len(self.__class__), self.value)  # type: ignore
+
 
 _COLORS = [  # TODO: JSON / YAML as module importer
     "BLACK",
@@ -38,3 +42,7 @@ class _Registry(Dict[int, BasePlayer]):
 
 
 Player = _Registry()
+
+
+def _restore_player(num_players: int, value: int) -> BasePlayer:
+    return Player[num_players](value)  # type: ignore
@@ -0,0 +1,141 @@
+from os import PathLike
+from typing import List, Optional
+
+import numpy as np
+
+from connect6.game import common
+from connect6.game.player import BasePlayer
+from connect6.game.state import GameState
+from connect6.game.storage import CellStorage
+from connect6.game.turn_data import BaseTurnData, TurnData
+
+__all__ = [
+    "ReplayCursor",
+]
+
+
+class ReplayCursor:
+    """Random access to positions of a game.
+
+    Boards are checkpointed every ``checkpoint_interval`` turns, so seeking
+    replays at most that many turns. The position is described the same way
+    as in ``GameState``: ``num_turns == 1`` is the initial position.
+    """
+
+    CHECKPOINT_INTERVAL = 16
+
+    def __init__(
+        self, state: GameState, checkpoint_interval: Optional[int] = None
+    ) -> None:
+        self._state = state
+        self._interval = (
+            self.CHECKPOINT_INTERVAL
+            if checkpoint_interval is None
+            else checkpoint_interval
+        )
+        if self._interval < 1:
+            raise RuntimeError(
+                f"Checkpoint interval should be ≥ 1, got {self._interval}"
+            )
+
+        # (num_moves,) and (num_moves, num_cells_per_turn, 2)
+        turns = list(state.turns())
+        self._players = np.array([data.player.value for data in turns], np.int32)
+        self._cells = np.array(
+            [[cell.as_tuple() for cell in data.cells] for data in turns], np.int32
+        ).reshape((len(turns), state.num_cells_per_turn, 2))
+
+        empty_state = GameState(
+            state.size,
+            state.num_players,
+            state.num_cells_per_turn,
+            state.num_cells_to_win,
+        )
+        self._board = empty_state.generate_board()
+        self._num_turns = 1
+        self._checkpoints: List[np.ndarray] = []
+        for num_turns in range(1, self.max_num_turns + 1):
+            if (num_turns - 1) % self._interval == 0:
+                self._checkpoints.append(self._board.astype(np.int8))
+            if num_turns < self.max_num_turns:
+                self.step_forward()
+        self.seek(1)
+
+    @classmethod
+    def load(
+        cls, path: PathLike, checkpoint_interval: Optional[int] = None
+    ) -> "ReplayCursor":
+        return cls(GameState.load(path), checkpoint_interval)
+
+    @property
+    def num_turns(self) -> int:
+        return self._num_turns
+
+    @property
+    def max_num_turns(self) -> int:
+        """Number of turns of the final position."""
+        return len(self._players) + 1
+
+    @property
+    def board(self) -> np.ndarray:
+        board = self._board.view()
+        board.flags.writeable = False
+        return board
+
+    def seek(self, num_turns: int) -> None:
+        if not (1 <= num_turns <= self.max_num_turns):
+            bounds = [1, self.max_num_turns]
+            raise IndexError(f"Turn {num_turns} not in {bounds}")
+
+        index = (num_turns - 1) // self._interval
+        if not (index * self._interval < self._num_turns <= num_turns):
+            self._board[...] = self._checkpoints[index]
+            self._num_turns = index * self._interval + 1
+        while self._num_turns < num_turns:
+            self.step_forward()
+
+    def step_forward(self) -> None:
+        if self._num_turns >= self.max_num_turns:
+            raise IndexError("Cannot step forward from the final position")
+        rows, cols = self._cells[self._num_turns - 1].T
+        self._board[rows, cols] = self._players[self._num_turns - 1]
+        self._num_turns += 1
+
+    def step_back(self) -> None:
+        if self._num_turns <= 1:
+            raise IndexError("Cannot step back from the initial position")
+        self._num_turns -= 1
+        rows, cols = self._cells[self._num_turns - 1].T
+        self._board[rows, cols] = 0
+
+    def last_turn(self) -> Optional[BaseTurnData]:
+        """Turn leading to the current position, `None` for the initial one."""
+        if self._num_turns == 1:
+            return None
+        index = self._num_turns - 2
+        player: BasePlayer = self._state.Player(int(self._players[index]))  # type: ignore
+        cells = [common.Cell(int(row), int(col)) for row, col in self._cells[index]]
+        return TurnData[self._state.num_cells_per_turn](player, cells)  # type: ignore
+
+    def state(self) -> GameState:
+        """Game state at the current position, histories are copied."""
+        num_moves = self._num_turns - 1
+        counts = np.bincount(
+            self._players[:num_moves], minlength=self._state.num_players + 1
+        )
+        full_history = self._state.as_dict()["history"]
+        history = {
+            player.name: CellStorage(
+                full_history[player.name][
+                    : counts[player.value] * self._state.num_cells_per_turn
+                ]
+            )
+            for player in self._state.Player  # type: ignore
+        }
+        return GameState(
+            self._state.size,
+            self._state.num_players,
+            self._state.num_cells_per_turn,
+            self._state.num_cells_to_win,
+            history,
+        )
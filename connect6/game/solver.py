@@ -0,0 +1,374 @@
+import dataclasses
+import enum
+import itertools
+import logging
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    OrderedDict,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from connect6.game import common
+from connect6.game.engine import GameEngine
+from connect6.game.geometry import Geometry
+from connect6.game.player import BasePlayer
+from connect6.game.turn_data import BaseTurnData, TurnData
+
+__all__ = [
+    "Outcome",
+    "SolverResult",
+    "ThreatSolver",
+]
+
+logger = logging.getLogger(__name__)
+
+INF = 10**9
+
+Move = Tuple[int, ...]
+
+
+class Outcome(enum.Enum):
+    # Proven against the pruned defence of ``ThreatSolver``: heuristic if
+    # ``num_cells_per_turn > 1``, sound otherwise
+    WIN = "win"
+    LOSS = "loss"
+    UNKNOWN = "unknown"
+
+
+@dataclasses.dataclass
+class SolverResult:
+    """Outcome for the current player and the forcing line proving it."""
+
+    outcome: Outcome
+    line: List[BaseTurnData]
+    num_nodes: int
+
+
+class _Node:
+    __slots__ = ("move", "is_or", "pn", "dn", "children")
+
+    def __init__(self, move: Move, is_or: bool, pn: int = 1, dn: int = 1) -> None:
+        self.move = move
+        self.is_or = is_or
+        self.pn = pn
+        self.dn = dn
+        self.children: Optional[List["_Node"]] = None
+
+    @property
+    def is_solved(self) -> bool:
+        return self.pn == 0 or self.dn == 0
+
+    def update(self) -> None:
+        if self.children is None:
+            return
+        pns = [child.pn for child in self.children]
+        dns = [child.dn for child in self.children]
+        if self.is_or:
+            self.pn = min(pns, default=INF)
+            self.dn = min(sum(dns), INF)
+        else:
+            self.pn = min(sum(pns), INF)
+            self.dn = min(dns, default=INF)
+
+
+class _TranspositionTable(OrderedDict[int, bool]):
+    """Bounded table of solved positions: hash -> whether attacker wins."""
+
+    def __init__(self, max_size: int) -> None:
+        super().__init__()
+        self.max_size = max_size
+
+    def __setitem__(self, key: int, value: bool) -> None:
+        super().__setitem__(key, value)
+        if len(self) > self.max_size:
+            self.popitem(last=False)
+
+
+class ThreatSolver:
+    """Proof-number search over threat moves for the current player.
+
+    The attacker (current player) only makes turns creating threats, i.e.
+    windows which can be completed on the next turn, and the defender only
+    replies with turns blocking all of them. Moves are made and unmade in
+    place on a single board, solved positions are kept in a bounded
+    transposition table. Only two-player games are supported.
+
+    If ``num_cells_per_turn > 1``, defender's stones beyond the blocking ones
+    are only tried near threats and developed windows, so ``Outcome.WIN`` is a
+    heuristic result: a reply outside of them may refute the line. With one
+    stone per turn every reply has to block, and the result is exact.
+
+    The search stops before an expansion which would exceed ``max_nodes``, so
+    the number of nodes never exceeds it.
+
+    The solver may be reused: every ``solve`` call gets the whole node budget
+    and reports its own number of nodes, while solved positions are kept in
+    the transposition table between calls.
+    """
+
+    def __init__(
+        self,
+        engine: GameEngine,
+        max_nodes: int = 100_000,
+        max_table_size: int = 1_000_000,
+    ) -> None:
+        state = engine.state
+        if state.num_players != 2:
+            raise RuntimeError(f"Solver supports 2 players, got {state.num_players}")
+        self._size = state.size
+        self._num_cells_per_turn = state.num_cells_per_turn
+        self._num_cells_to_win = state.num_cells_to_win
+        self._max_nodes = max_nodes
+        self._table = _TranspositionTable(max_table_size)
+
+        self._attacker = engine.current_player
+        self._defender = state.Player.current(state.num_turns + 1)
+        self._board = state.generate_board().ravel()
+        self._geometry = Geometry[self._size, self._num_cells_to_win]
+
+        rng = np.random.default_rng(self._size)
+        keys = rng.integers(0, 2**63, size=(self._size**2, 3), dtype=np.int64)
+        self._keys: List[List[int]] = keys.tolist()
+        self._hash = 0
+        for index in np.flatnonzero(self._board):
+            self._hash ^= self._keys[index][self._board[index]]
+
+        self._num_nodes = 0
+        self._is_exhausted = False
+        # Expanded proven nodes, to follow transpositions when building the line
+        self._proofs: Dict[int, _Node] = {}
+
+    def solve(self) -> SolverResult:
+        self._num_nodes = 0
+        self._is_exhausted = False
+        attacker, defender = self._attacker.value, self._defender.value
+        if self._can_win_now(attacker):
+            return self._result(Outcome.WIN, _Node((), is_or=True, pn=0, dn=INF))
+        threats = self._threats(defender)
+        cells = self._padded(self._empty(threats))
+        if threats and not any(self._blocking_moves(threats, cells)):
+            return self._result(Outcome.LOSS, None)
+
+        root = self._evaluate(_Node((), is_or=True))
+        while not root.is_solved and not self._is_exhausted:
+            self._search_iteration(root)
+
+        logger.info(f"Solved in {self._num_nodes} nodes: {root.pn=}, {root.dn=}")
+        outcome = Outcome.WIN if root.pn == 0 else Outcome.UNKNOWN
+        return self._result(outcome, root)
+
+    def _search_iteration(self, root: _Node) -> None:
+        # Select the most proving node making moves along the path
+        path = [root]
+        node = root
+        while node.children is not None:
+            children = node.children
+            if node.is_or:
+                node = min(children, key=lambda child: child.pn)
+            else:
+                node = min(children, key=lambda child: child.dn)
+            self._make(node)
+            path.append(node)
+
+        self._expand(node)
+
+        # Update proof numbers back to the root unmaking moves
+        for node in reversed(path):
+            node.update()
+            if node.is_solved:
+                self._table[self._hash] = node.pn == 0
+                if node.pn == 0:
+                    self._proofs[self._hash] = node
+            if node is not root:
+                self._unmake(node)
+
+    def _expand(self, node: _Node) -> None:
+        """Adds all children of the node, or none if they exceed the budget."""
+        moves = self._attacker_moves() if node.is_or else self._defender_moves()
+        children: List[_Node] = []
+        for move in moves:
+            if self._num_nodes + len(children) >= self._max_nodes:
+                self._is_exhausted = True
+                return
+            child = _Node(move, is_or=not node.is_or)
+            self._make(child)
+            children.append(self._evaluate(child))
+            self._unmake(child)
+        node.children = children
+        self._num_nodes += len(children)
+
+    def _evaluate(self, node: _Node) -> _Node:
+        """Sets proof numbers of the node as a leaf, position is already made."""
+        if self._hash in self._table:
+            proven = self._table[self._hash]
+            node.pn, node.dn = (0, INF) if proven else (INF, 0)
+        elif node.is_or and self._can_win_now(self._attacker.value):
+            node.pn, node.dn = 0, INF
+        elif not node.is_or and self._can_win_now(self._defender.value):
+            node.pn, node.dn = INF, 0
+        return node
+
+    def _attacker_moves(self) -> List[Move]:
+        """Turns creating threats and blocking all opponent's ones.
+
+        The turns with more threats go first, so they're tried first too.
+        """
+        attacker = self._attacker.value
+        opponent_threats = self._threats(self._defender.value)
+        cells = self._empty(self._windows_with(attacker, self._min_developed))
+        cells = self._padded(set(cells) | set(self._empty(opponent_threats)))
+        moves = []
+        for move in self._blocking_moves(opponent_threats, cells):
+            self._place(move, attacker)
+            num_threats = len(self._threats(attacker, move))
+            self._place(move, 0)
+            if num_threats > 0:
+                moves.append((num_threats, move))
+        moves.sort(key=lambda item: -item[0])
+        return [move for _, move in moves]
+
+    def _defender_moves(self) -> Iterator[Move]:
+        """Turns blocking all threats, the rest of stones go near the threats.
+
+        This prunes the defence if there are free stones, see the class docstring.
+        """
+        attacker, defender = self._attacker.value, self._defender.value
+        threats = self._threats(attacker)
+        cells = set(self._empty(threats))
+        for value in [attacker, defender]:
+            cells |= set(self._empty(self._windows_with(value, self._min_developed)))
+        yield from self._blocking_moves(threats, self._padded(cells))
+
+    def _blocking_moves(
+        self, threats: List[np.ndarray], cells: Sequence[int]
+    ) -> Iterator[Move]:
+        threat_sets: List[FrozenSet[int]] = [frozenset(w.tolist()) for w in threats]
+        for move in itertools.combinations(cells, self._num_cells_per_turn):
+            if all(not threat.isdisjoint(move) for threat in threat_sets):
+                yield move
+
+    @property
+    def _min_developed(self) -> int:
+        """Minimal number of stones in a window to create a threat in one turn."""
+        return max(self._num_cells_to_win - 2 * self._num_cells_per_turn, 1)
+
+    def _can_win_now(self, value: int) -> bool:
+        return len(self._threats(value)) > 0
+
+    def _threats(self, value: int, move: Optional[Move] = None) -> List[np.ndarray]:
+        """Windows which can be completed by the player in one turn."""
+        min_count = self._num_cells_to_win - self._num_cells_per_turn
+        return self._windows_with(value, min_count, move)
+
+    def _windows_with(
+        self, value: int, min_count: int, move: Optional[Move] = None
+    ) -> List[np.ndarray]:
+        """Windows without opponent stones and at least `min_count` player's ones.
+
+        If `move` is given, only windows passing through its cells are checked.
+        """
+        if move is None:
+            windows = self._geometry.unique_windows
+        else:
+            indices = list(move)
+            windows = self._geometry.windows[indices][
+                self._geometry.window_masks[indices]
+            ]
+        values = self._board[windows]
+        count = (values == value).sum(axis=1)
+        is_free = ((values == 0) | (values == value)).all(axis=1)
+        return list(windows[is_free & (count >= min_count)])
+
+    def _empty(self, windows: List[np.ndarray]) -> List[int]:
+        if not windows:
+            return []
+        indices = np.unique(np.concatenate(windows))
+        return indices[self._board[indices] == 0].tolist()
+
+    def _padded(self, cells: Iterable[int]) -> List[int]:
+        """Sorted cells, complemented with other empty ones to make a turn."""
+        cells = sorted(cells)
+        for index in np.flatnonzero(self._board == 0).tolist():
+            if len(cells) >= self._num_cells_per_turn:
+                break
+            if index not in cells:
+                cells.append(index)
+        return cells
+
+    def _place(self, move: Move, value: int) -> None:
+        self._board[list(move)] = value
+
+    def _make(self, node: _Node) -> None:
+        value = self._mover(node).value
+        for index in node.move:
+            self._board[index] = value
+            self._hash ^= self._keys[index][value]
+
+    def _unmake(self, node: _Node) -> None:
+        value = self._mover(node).value
+        for index in node.move:
+            self._board[index] = 0
+            self._hash ^= self._keys[index][value]
+
+    def _mover(self, node: _Node) -> BasePlayer:
+        # The move leading to an AND node was made by the attacker
+        return self._defender if node.is_or else self._attacker
+
+    def _result(self, outcome: Outcome, root: Optional[_Node]) -> SolverResult:
+        line = [] if root is None or outcome is not Outcome.WIN else self._line(root)
+        return SolverResult(outcome, line, self._num_nodes)
+
+    def _line(self, root: _Node) -> List[BaseTurnData]:
+        """Follows proven children from the root.
+
+        The line ends with a winning turn or with threats which can't be blocked.
+        """
+        attacker = self._attacker.value
+        line: List[BaseTurnData] = []
+        path: List[_Node] = []
+        node = root
+        while True:
+            if node.is_or and self._can_win_now(attacker):
+                window, *_ = self._threats(attacker)
+                cells = self._padded(self._empty([window]))
+                line.append(self._turn_data(_Node(tuple(cells), is_or=False)))
+                break
+            if node.children is None:
+                # Proven by the transposition table, follow the node which proved it
+                node = self._proofs.get(self._hash, node)
+            if not node.children:
+                break
+
+            proven = [child for child in node.children if child.pn == 0]
+            for child in proven:
+                self._make(child)
+                if self._has_continuation(child):
+                    break
+                self._unmake(child)
+            else:
+                break
+            path.append(child)
+            line.append(self._turn_data(child))
+            node = child
+        for node in reversed(path):
+            self._unmake(node)
+        return line
+
+    def _has_continuation(self, node: _Node) -> bool:
+        """Checks if the line can go on from the node, its position is made."""
+        if node.children is not None or self._hash in self._proofs:
+            return True
+        return node.is_or and self._can_win_now(self._attacker.value)
+
+    def _turn_data(self, node: _Node) -> BaseTurnData:
+        cells = [common.Cell(*map(int, divmod(i, self._size))) for i in node.move]
+        player = self._mover(node)
+        return TurnData[self._num_cells_per_turn](player, cells)  # type: ignore
@@ -1,13 +1,14 @@
 from collections import defaultdict
 from os import PathLike
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 import numpy as np
 
+from connect6.game import common
 from connect6.game.player import Player
 from connect6.game.storage import CellStorage
-from connect6.game.turn_data import BaseTurnData
+from connect6.game.turn_data import BaseTurnData, TurnData
 
 
 class GameState:
@@ -55,6 +56,29 @@ class GameState:
         for cell in data.cells:
             self._history[data.player].add(cell)
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        history = {player.name: history for player, history in self._history.items()}
+        return self.__class__, (
+            self.size,
+            self.num_players,
+            self.num_cells_per_turn,
+            self.num_cells_to_win,
+            history,
+        )
+
+    def turns(self) -> Iterator[BaseTurnData]:
+        """Yields historical turns in the order they were made, except the first one."""
+        offsets = {player: 0 for player in self.Player}  # type: ignore
+        for num_turns in range(1, self.num_turns):
+            player = self.Player.current(num_turns)
+            start = offsets[player]
+            offsets[player] += self.num_cells_per_turn
+            cells = [
+                common.Cell(int(row), int(col))
+                for row, col in self._history[player].data[start : offsets[player]]
+            ]
+            yield TurnData[self.num_cells_per_turn](player, cells)  # type: ignore
+
     def as_dict(self) -> Dict[str, Any]:
         history = {
             player.name: history.data for player, history in self._history.items()
@@ -69,10 +93,10 @@ class GameState:
 
     @classmethod
     def from_dict(cls, state_dict: Dict[str, Any]) -> "GameState":
-        state_dict["history"] = {
+        history = {
             name: CellStorage(buffer) for name, buffer in state_dict["history"].items()
         }
-        return cls(**state_dict)
+        return cls(**{**state_dict, "history": history})
 
     def dump(self, path: PathLike) -> None:
         Path(path).parent.mkdir(parents=True, exist_ok=True)
@@ -1,4 +1,5 @@
-from typing import Optional, Tuple
+import pickle
+from typing import Any, Optional, SupportsIndex, Tuple
 
 import numpy as np
 
@@ -39,10 +40,27 @@ class CellStorage:
         self._buffer[len(self)] = cell.as_tuple()
         self._length += 1
 
+    def __reduce_ex__(self, protocol: SupportsIndex) -> Tuple[Any, ...]:
+        """Pickles only the used part of the buffer, out-of-band with protocol 5."""
+        data = np.ascontiguousarray(self.data)
+        if int(protocol) >= 5:
+            buffer = pickle.PickleBuffer(data)  # type: ignore
+            return self._from_buffer, (buffer, len(self))
+        return self.__class__, (data,)
+
+    @classmethod
+    def _from_buffer(cls, buffer: Any, length: int) -> "CellStorage":
+        # No copy here: the buffer is replaced by a new one on the next `add`
+        storage = cls.__new__(cls)
+        storage._buffer = np.frombuffer(buffer, np.int32).reshape((length, 2))
+        storage._length = length
+        return storage
+
     def rows_cols(self) -> Tuple[np.ndarray, np.ndarray]:
         return self.data[..., 0].flatten(), self.data[..., 1].flatten()
 
     def _extend_buffer(self) -> None:
-        buffer = np.empty((self.EXTEND_FACTOR * len(self), 2), self._buffer.dtype)
+        length = max(self.EXTEND_FACTOR * len(self), self.INITIAL_LENGTH)
+        buffer = np.empty((length, 2), self._buffer.dtype)
         buffer[: len(self)] = self._buffer[: len(self)]
         self._buffer = buffer
@@ -1,5 +1,5 @@
 import dataclasses
-from typing import Dict, List
+from typing import Any, Dict, List, Tuple
 
 from connect6.game import common, errors, player
 
@@ -11,6 +11,8 @@ __all__ = [
 
 @dataclasses.dataclass
 class BaseTurnData:
+    __slots__ = ("player", "cells")
+
     player: player.BasePlayer
     cells: List[common.Cell]
 
@@ -18,8 +20,12 @@ class BaseTurnData:
         self._check_num_cells(len(self.cells))
         self._check_cells_are_different(self.cells)
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # TurnData classes are created dynamically, so they're restored via registry
+        return _restore_turn_data, (self.player, self.cells)
+
     def _check_cells_are_different(self, cells: List[common.Cell]) -> None:
-        if len(set(cells)) != len(cells):
+        if len(cells) > 1 and len(set(cells)) != len(cells):
             raise errors.EqualCellsInTurnError()
 
     @classmethod
@@ -40,9 +46,17 @@ class _Registry(Dict[int, BaseTurnData]):
             raise RuntimeError(f"Turn should consist of ≥ 1 cells, got {num_cells}")
         if num_cells not in self:
             self[num_cells] = type(  # type: ignore
-                f"TurnData{num_cells}", (BaseTurnData,), dict(num_cells=num_cells)
+                f"TurnData{num_cells}",
+                (BaseTurnData,),
+                dict(__slots__=(), num_cells=num_cells),
             )
         return super().__getitem__(num_cells)
 
 
 TurnData = _Registry()
+
+
+def _restore_turn_data(
+    player: player.BasePlayer, cells: List[common.Cell]
+) -> BaseTurnData:
+    return TurnData[len(cells)](player, cells)  # type: ignore
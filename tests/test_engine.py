@@ -1,12 +1,18 @@
 import itertools
+import logging
 import math
+import pickle
 import tempfile
 from pathlib import Path
 
 import numpy as np
 import pytest
 
-from connect6.game import GameEngine, Player, TurnData, common, errors
+from connect6.game import GameEngine, Player, TurnData, common, constants, errors
+from connect6.game.archive import GameArchive
+from connect6.game.geometry import BoardGeometry, Geometry
+from connect6.game.replay import ReplayCursor
+from connect6.game.solver import Outcome, ThreatSolver
 from connect6.game.state import GameState
 from connect6.game.storage import CellStorage
 
@@ -30,6 +36,21 @@ def test_cell_interface(row, col):
             common.Cell(-row, -col)
 
 
+@pytest.mark.parametrize("row", [0, 30, 31, 1000])
+def test_cell_interning(row):
+    cell = common.Cell(row, 1)
+    assert cell == common.Cell(row, 1)
+    assert hash(cell) == hash(common.Cell(row, 1))
+    assert pickle.loads(pickle.dumps(cell)) == cell
+    assert not hasattr(cell, "__dict__")
+    if row < constants.MAX_BOARD_SIZE:
+        assert cell is common.Cell(np.int64(row), 1)
+        assert pickle.loads(pickle.dumps(cell)) is cell
+
+    data = TurnData[2](Player[2](1), [cell, common.Cell(0, 0)])
+    assert not hasattr(data, "__dict__")
+
+
 @pytest.mark.parametrize("length", [10, 100, 1000])
 def test_cell_storage_interface(length):
     history = CellStorage()
@@ -158,6 +179,77 @@ def test_max_segment_length():
     assert common.max_segment_length(array, 5) == 0
 
 
+@pytest.mark.parametrize("size", [15, 19, 31])
+@pytest.mark.parametrize("num_cells_to_win", [5, 6])
+def test_geometry_tables(size, num_cells_to_win):
+    geometry = Geometry[size, num_cells_to_win]
+    assert geometry is Geometry[size, num_cells_to_win]
+    assert not geometry.windows.flags.writeable
+
+    rng = np.random.default_rng(size * num_cells_to_win)
+    board = rng.integers(0, 3, size=(size, size), dtype=np.int32)
+    flat_board = board.ravel()
+    radius = num_cells_to_win - 1
+    for row, col in [(0, 0), (size - 1, 0), (size // 2, size // 2), (3, size - 2)]:
+        cell = common.Cell(row, col)
+        index = geometry.flat_index(cell)
+        assert flat_board[index] == board[row, col]
+
+        windows = geometry.windows[index][geometry.window_masks[index]]
+        assert (windows == index).any(axis=-1).all()
+        rows, cols = np.divmod(windows, size)
+        assert (np.abs(rows - row) <= radius).all()
+        assert (np.abs(cols - col) <= radius).all()
+
+        neighbors = geometry.neighbors[index][geometry.neighbor_masks[index]]
+        rows, cols = np.divmod(neighbors, size)
+        assert np.maximum(np.abs(rows - row), np.abs(cols - col)).max() == 1
+        assert len(neighbors) == sum(
+            0 <= row + dr < size and 0 <= col + dc < size
+            for dr, dc in itertools.product([-1, 0, 1], repeat=2)
+            if (dr, dc) != (0, 0)
+        )
+
+        for value in [1, 2]:
+            lines = np.where(
+                geometry.line_masks[index], flat_board[geometry.lines[index]], 0
+            )
+            expected = any(
+                common.max_segment_length(list(line), value) >= num_cells_to_win
+                for line in lines
+            )
+            assert geometry.is_win(flat_board, index, value) == expected
+
+
+def test_geometry_cache_eviction(monkeypatch):
+    limit = BoardGeometry(17, 4).nbytes
+    monkeypatch.setattr(type(Geometry), "MAX_BYTES", limit)
+    geometry = Geometry[17, 4]
+    assert list(Geometry) == [(17, 4)]
+    assert Geometry.nbytes <= limit
+
+    # Too large to be cached at all
+    assert Geometry[21, 4] is not Geometry[21, 4]
+    assert list(Geometry) == [(17, 4)]
+
+    assert Geometry[15, 4] is Geometry[15, 4]
+    assert list(Geometry) == [(15, 4)]
+    assert Geometry[17, 4] is not geometry
+
+
+def test_geometry_windows_larger_than_board():
+    geometry = BoardGeometry(15, 120)
+    assert geometry.windows.shape == (15**2, 0, 120)
+    assert len(geometry.unique_windows) == 0
+    assert geometry.nbytes < BoardGeometry(15, 15).nbytes
+    assert not geometry.is_win(np.ones(15**2, np.int32), 0, 1)
+
+    engine = GameEngine(15, num_cells_to_win=120)
+    data = TurnData[2](engine.current_player, [common.Cell(0, 0), common.Cell(0, 1)])
+    engine.turn(data)
+    assert not engine.is_win(data)
+
+
 @pytest.mark.parametrize("size", [15, 19])
 @pytest.mark.parametrize("num_players", [2, 3])
 @pytest.mark.parametrize("num_cells_per_turn", [1, 2, 3, 10])
@@ -325,15 +417,7 @@ def test_valid_connect6_game(restore_turn):
     )
     assert connect6.is_occupied(common.Cell(9, 9))
 
-    # fmt: off
-    turns = [
-        [(9, 8), (8, 9)], [(8, 10), (7, 10)],
-        [(9, 10), (10, 9)], [(7, 9), (7, 8)],
-        [(7, 7), (8, 7)], [(7, 11), (7, 12)],
-        [(7, 13), (7, 6)], [(6, 12), (11, 10)],
-        [(5, 4), (6, 5)],
-    ]
-    # fmt: on
+    turns = CONNECT6_TURNS
     turn_generator = enumerate(turns, start=1)
 
     winner = None
@@ -354,3 +438,286 @@ def test_valid_connect6_game(restore_turn):
 
     assert winner is Player[2](2)
     assert connect6.state.num_turns == len(turns) + 1
+
+
+# WHITE wins with the last turn
+# fmt: off
+CONNECT6_TURNS = [
+    [(9, 8), (8, 9)], [(8, 10), (7, 10)],
+    [(9, 10), (10, 9)], [(7, 9), (7, 8)],
+    [(7, 7), (8, 7)], [(7, 11), (7, 12)],
+    [(7, 13), (7, 6)], [(6, 12), (11, 10)],
+    [(5, 4), (6, 5)],
+]
+# fmt: on
+
+
+def _play(engine, turns):
+    for row_cols in turns:
+        player = engine.current_player
+        cells = [common.Cell(*row_col) for row_col in row_cols]
+        data = TurnData[engine.state.num_cells_per_turn](player, cells)
+        engine.turn(data)
+        if engine.is_win(data):
+            break
+    return engine
+
+
+def test_state_turns():
+    # fmt: off
+    turns = [
+        [(0, 0), (0, 1)], [(1, 0), (1, 1)], [(2, 0), (2, 1)],
+        [(3, 0), (3, 1)], [(4, 0), (4, 1)],
+    ]
+    # fmt: on
+    engine = _play(GameEngine(15, num_players=3), turns)
+    replayed = list(engine.state.turns())
+    assert len(replayed) == len(turns)
+    for num_turns, (data, row_cols) in enumerate(zip(replayed, turns), start=1):
+        assert data.player is Player[3].current(num_turns)
+        assert [cell.as_tuple() for cell in data.cells] == row_cols
+
+
+def test_archive_queries(tmp_path):
+    # fmt: off
+    black_wins = [
+        [(0, 0), (0, 1)], [(9, 10), (9, 11)], [(1, 0), (1, 1)],
+        [(9, 12), (9, 13)], [(2, 0), (2, 1)], [(9, 14), (5, 5)],
+    ]
+    # fmt: on
+    white_wins = CONNECT6_TURNS
+    unfinished = black_wins[:3]
+    games = [_play(GameEngine(), turns) for turns in [black_wins, white_wins]]
+    games.append(_play(GameEngine(), unfinished))
+    # The engine doesn't stop the game after the win
+    games.append(_play(GameEngine(), black_wins))
+    _play(games[3], [[(3, 0), (3, 1)], [(4, 0), (4, 1)], [(3, 5), (3, 6)]])
+    assert games[3].state.num_turns == 10
+    with GameArchive(tmp_path / "archive") as archive:
+        ids = [archive.add(engine.state) for engine in games]
+        assert len(archive) == 4
+        assert archive.find_ids(winner=Player[2](1)) == [ids[0], ids[3]]
+        assert archive.find_ids(winner=Player[2](2)) == [ids[1]]
+        assert archive.find_ids(max_num_turns=8) == [ids[0], ids[2]]
+        assert archive.find_ids(winner=Player[2](1), min_num_turns=9) == [ids[3]]
+        assert archive.find_ids(size=15) == []
+
+        # Black won in the 6th turn in both games, though one went on
+        assert archive.find_ids(winner=Player[2](1), max_win_turn=6) == [
+            ids[0],
+            ids[3],
+        ]
+        assert archive.find_ids(max_win_turn=5) == []
+        assert archive.find_ids(min_win_turn=7) == [ids[1]]
+        assert archive.find_ids(min_win_turn=1, max_num_turns=8) == [ids[0]]
+
+        position = GameState(19, 2, 2, 6).generate_board()
+        assert archive.find_ids(position=position) == ids
+        position = games[2].state.generate_board()
+        assert archive.find_ids(position=position) == [ids[0], ids[2], ids[3]]
+        position = games[1].state.generate_board()
+        assert archive.find_ids(position=position) == [ids[1]]
+
+        (state,) = archive.find(winner=Player[2](2))
+        assert state.num_turns == games[1].state.num_turns
+        assert (state.generate_board() == position).all()
+
+        # Re-indexing is incremental
+        assert sorted(archive.scan()) == ids
+        assert len(archive) == 4
+
+    with GameArchive(tmp_path / "archive") as archive:
+        assert len(archive) == 4
+        assert archive.find_ids(position=position) == [ids[1]]
+
+
+@pytest.mark.parametrize("protocol", [2, 4, 5])
+def test_pickle_game(protocol):
+    engine = _play(GameEngine(), CONNECT6_TURNS[:4])
+    data = TurnData[2](Player[2](2), [common.Cell(0, 0), common.Cell(1, 1)])
+    for obj in [Player[2](2), Player[3](3), data]:
+        assert pickle.loads(pickle.dumps(obj, protocol)) == obj
+    assert pickle.loads(pickle.dumps(Player[3](3), protocol)) is Player[3](3)
+
+    buffers = []
+    if protocol >= 5:
+        dumped = pickle.dumps(engine, protocol, buffer_callback=buffers.append)
+    else:
+        dumped = pickle.dumps(engine, protocol)
+    restored = pickle.loads(dumped, buffers=buffers)
+    assert len(buffers) == (2 if protocol >= 5 else 0)
+    assert restored.state.num_turns == engine.state.num_turns
+    assert restored.current_player is engine.current_player
+    assert (restored.state.generate_board() == engine.state.generate_board()).all()
+    for player, history in restored.state._history.items():
+        original = engine.state._history[player].data
+        assert (history.data == original).all()
+        assert np.shares_memory(history.data, original) == (protocol >= 5)
+
+    # Restored game can be continued without affecting the original one
+    _play(restored, [[(0, 0), (0, 1)]])
+    assert restored.state.num_turns == engine.state.num_turns + 1
+    assert not engine.is_occupied(common.Cell(0, 0))
+
+
+def test_state_from_dict_keeps_input():
+    state_dict = GameState(15, 2, 2, 6).as_dict()
+    history = state_dict["history"]
+    GameState.from_dict(state_dict)
+    assert state_dict["history"] is history
+
+
+@pytest.mark.parametrize("snapshot_turn", range(1, 9))
+def test_move_log_sync(snapshot_turn):
+    turns = CONNECT6_TURNS[:-1]
+    engine = GameEngine()
+    received = []
+    engine.log.subscribe(received.append)
+    _play(engine, turns[: snapshot_turn - 1])
+    snapshot = pickle.loads(pickle.dumps(engine.state))
+    _play(engine, turns[snapshot_turn - 1 :])
+
+    assert [move.seq for move in received] == list(range(1, len(turns) + 1))
+    assert engine.log.last_seq == len(turns)
+    assert engine.log.since(snapshot_turn - 1) == received[snapshot_turn - 1 :]
+
+    replica = GameEngine.restore(snapshot)
+    assert replica.log.since(0) == received[: snapshot_turn - 1]
+    if snapshot_turn < len(turns):
+        with pytest.raises(errors.MissingMovesError):
+            replica.fast_forward(engine.log.since(snapshot_turn))
+    replica.fast_forward(engine.log.since(0))
+    assert replica.state.num_turns == engine.state.num_turns
+    assert (replica.state.generate_board() == engine.state.generate_board()).all()
+    assert replica.log.since(0) == engine.log.since(0)
+
+    engine.log.unsubscribe(received.append)
+    _play(engine, [[(0, 0), (0, 1)]])
+    assert len(received) == len(turns)
+
+
+def test_move_log_isolates_failing_subscriber(caplog):
+    def fail(move):
+        raise ValueError(move.seq)
+
+    engine = GameEngine()
+    received = []
+    engine.log.subscribe(fail)
+    engine.log.subscribe(received.append)
+    with caplog.at_level(logging.ERROR, logger="connect6.game.move_log"):
+        _play(engine, CONNECT6_TURNS[:2])
+
+    assert [move.seq for move in received] == [1, 2]
+    assert engine.state.num_turns == 3
+    assert len(caplog.records) == 2
+
+
+def _gomoku(black, white):
+    return GameEngine.restore(
+        GameState.from_dict(
+            {
+                "size": 15,
+                "num_players": 2,
+                "num_cells_per_turn": 1,
+                "num_cells_to_win": 5,
+                "history": {
+                    Player[2](1).name: np.array(black, np.int32).reshape((-1, 2)),
+                    Player[2](2).name: np.array(white, np.int32).reshape((-1, 2)),
+                },
+            }
+        )
+    )
+
+
+def test_solver_proves_forcing_win():
+    # Black has an open three in the row 7 and makes an open four
+    engine = _gomoku([(7, 8), (7, 9)], [(0, 0), (14, 14), (0, 14)])
+    assert engine.current_player is Player[2](1)
+    result = ThreatSolver(engine).solve()
+    assert result.outcome is Outcome.WIN
+    (data,) = result.line
+    assert data.player is engine.current_player
+    assert data.cells in [[common.Cell(7, 6)], [common.Cell(7, 10)]]
+
+    # Open four can't be blocked
+    engine.turn(data)
+    ends = [common.Cell(7, col) for col in [5, 6, 10, 11]]
+    block, win = [cell for cell in ends if not engine.is_occupied(cell)][:2]
+    engine.turn(TurnData[1](engine.current_player, [block]))
+    data = TurnData[1](engine.current_player, [win])
+    engine.turn(data)
+    assert engine.is_win(data)
+
+
+def test_solver_proves_loss_and_respects_budget():
+    engine = _gomoku([(14, 0), (14, 14), (12, 7)], [(0, 2), (0, 3), (0, 4), (0, 5)])
+    assert ThreatSolver(engine).solve().outcome is Outcome.LOSS
+
+    turns = CONNECT6_TURNS[:5]
+    engine = _play(GameEngine(), turns)
+    solver = ThreatSolver(engine)
+    result = solver.solve()
+    assert result.outcome is Outcome.WIN
+    assert result.line[0].player is engine.current_player
+    assert result.num_nodes > 0
+
+    # Now the root is proven by the transposition table alone
+    result_again = solver.solve()
+    assert result_again.outcome is Outcome.WIN
+    assert result_again.line == result.line
+    assert result_again.num_nodes == 0
+
+    engine = _play(GameEngine(), turns[:3])
+    for max_nodes in [1, 10, 100, 1000]:
+        solver = ThreatSolver(engine, max_nodes=max_nodes)
+        for _ in range(2):
+            result = solver.solve()
+            assert result.outcome is Outcome.UNKNOWN
+            assert result.line == []
+            assert result.num_nodes <= max_nodes
+
+
+@pytest.mark.parametrize("checkpoint_interval", [1, 3, 16])
+def test_replay_cursor(tmp_path, checkpoint_interval):
+    turns = CONNECT6_TURNS
+    boards = [_play(GameEngine(), turns[:k]).state.generate_board() for k in range(10)]
+    engine = _play(GameEngine(), turns)
+    cursor = ReplayCursor(engine.state, checkpoint_interval)
+    assert cursor.num_turns == 1
+    assert cursor.max_num_turns == len(turns) + 1
+    assert cursor.last_turn() is None
+
+    for num_turns in [10, 1, 5, 6, 2, 9, 9, 3]:
+        cursor.seek(num_turns)
+        assert cursor.num_turns == num_turns
+        assert (cursor.board == boards[num_turns - 1]).all()
+
+    cursor.seek(1)
+    for num_turns in range(2, 11):
+        cursor.step_forward()
+        assert (cursor.board == boards[num_turns - 1]).all()
+        last_turn = cursor.last_turn()
+        assert last_turn.player is Player[2].current(num_turns - 1)
+        assert [cell.as_tuple() for cell in last_turn.cells] == turns[num_turns - 2]
+    with pytest.raises(IndexError):
+        cursor.step_forward()
+
+    for num_turns in range(9, 0, -1):
+        cursor.step_back()
+        assert (cursor.board == boards[num_turns - 1]).all()
+        state = cursor.state()
+        assert state.num_turns == num_turns
+        assert (state.generate_board() == boards[num_turns - 1]).all()
+    with pytest.raises(IndexError):
+        cursor.step_back()
+    with pytest.raises(IndexError):
+        cursor.seek(11)
+    for bad_interval in [0, -1]:
+        with pytest.raises(RuntimeError):
+            ReplayCursor(engine.state, bad_interval)
+
+    with GameArchive(tmp_path / "archive") as archive:
+        game_id = archive.add(engine.state)
+        cursor = archive.replay(game_id, checkpoint_interval)
+        cursor.seek(7)
+        assert (cursor.board == boards[6]).all()